@@ -2,7 +2,7 @@ import pygame
 from logic.Board import Board
 from logic.Handler import LogicHandler
 from render.Utils import centerCoord
-from render.Components import Container, BoldStaticTextRender, Button, Graph, ToggleButton, ASSETS_PATH
+from render.Components import Container, BoldStaticTextRender, Button, Graph, ToggleButton, ASSETS_PATH, nextFrame, takeDirtyRects
 from render.ComplexComponents import BoardRender, TpsRender, TimeBarRender, PresetContainer, SavePopup
 import win32api
 import win32con
@@ -96,22 +96,27 @@ class Interface:
     def run(self):
         self.logic.start()
         clock = pygame.time.Clock()
+        first_frame = True
+        screen_area = self.screen.get_width() * self.screen.get_height()
         while self.running:
-            # process key press in individual events for granular use
-            for event in pygame.event.get([pygame.KEYDOWN]):
-                pygame.event.post(pygame.event.Event(pygame.USEREVENT + event.key))
-                pygame.event.post(event)  # post the original event back to the queue
-            # handle the events
-            self.main.handleEvents()
-            for event in pygame.event.get():
-                pass  # consume remaining events
+            # pump the events first so the frame sees the mouse where they left it
+            events = pygame.event.get()
+            nextFrame()
+            # handle the events, children consume them from the frame list
+            self.main.handleEvents(events)
 
             # display the main container
             self.screen.fill(BACKGROUND_COLOR)
             self.main.render(self.screen)
 
-            # flip to refresh the screen
-            pygame.display.flip()
+            # only push the areas that changed to the window, unless most of it did
+            dirty_rects = takeDirtyRects()
+            dirty_area = sum(rect.w * rect.h for rect in dirty_rects)
+            if first_frame or len(dirty_rects) > 8 or dirty_area * 4 >= screen_area:
+                pygame.display.flip()
+                first_frame = False
+            elif dirty_rects:
+                pygame.display.update(dirty_rects)
             clock.tick(self.fps)
 
         # stop the logic handler if blocked at pause
@@ -1,7 +1,8 @@
 import pygame
 import math
 import numpy as np
-from render.Utils import mouseIn, centerCoord
+from PIL import Image
+from render.Utils import mouseIn, centerCoord, popEvents, getMousePos, scaleTo
 from logic.Board import Board, Preset
 from logic.Handler import LogicHandler
 from threading import Thread
@@ -30,25 +31,27 @@ class TimeBarRender(Child):
         self.setStates(not self.logic.isPaused())
         super().__init__(coord, (99, 18), parent)
 
-    def handleEvents(self):
+    def handleEvents(self, events: list[pygame.event.Event]):
         # handle keys for ease of use
-        if pygame.event.get([pygame.USEREVENT + pygame.K_SPACE]):
+        if popEvents(events, pygame.KEYDOWN, pygame.K_SPACE):
             self.toggle(not self.children[0].on)
-        if pygame.event.get([pygame.USEREVENT + pygame.K_1]):
+        if popEvents(events, pygame.KEYDOWN, pygame.K_1):
             self.setSpeed(5)
-        if pygame.event.get([pygame.USEREVENT + pygame.K_2]):
+        if popEvents(events, pygame.KEYDOWN, pygame.K_2):
             self.setSpeed(10)
-        if pygame.event.get([pygame.USEREVENT + pygame.K_3]):
+        if popEvents(events, pygame.KEYDOWN, pygame.K_3):
             self.setSpeed(20)
-        if pygame.event.get([pygame.USEREVENT + pygame.K_4]):
+        if popEvents(events, pygame.KEYDOWN, pygame.K_4):
             self.setSpeed(100)
         # handle events for each child
         for child in self.children:
-            child.handleEvents()
+            child.handleEvents(events)
 
     def render(self, screen: pygame.Surface):
-        for child in self.children:
-            child.render(screen)
+        screen.blits(self.getBlits(), doreturn=False)
+
+    def getBlits(self) -> list[tuple] | None:
+        return [blit for child in self.children for blit in child.getBlits()]
 
     def toggle(self, on: bool):
         self.setSpeed(self.logic.tick_rate if on else 0)
@@ -107,6 +110,9 @@ class TpsRender(BoldDynamicTextRender):
 class BoardRender(ScaledChild):
     board: Board | Preset
     resized_content: tuple[int, ...]
+    # board image the surface was made from, the board only builds a new one when it changes
+    drawn_image: Image.Image = None
+    surface: pygame.Surface = None
 
     def __init__(self, coord: tuple[int, ...], size: tuple[int, ...],
                  parent: 'Container', board: Board | Preset):
@@ -119,14 +125,23 @@ class BoardRender(ScaledChild):
             size[0] + 8
         ))
 
-        self.resized_content = tuple(math.floor(s * self.ratio) for s in board.getSize())
-        self.coord = centerCoord(self.coord, self.size, self.resized_content)
+        c_w, c_h = board.getSize()
+        self.resized_content = (int(c_w * self.ratio), int(c_h * self.ratio))
+        self.setRect(centerCoord(self.coord, self.size, self.resized_content), self.size)
 
-    def render(self, screen: pygame.Surface):
+    def getSurface(self) -> pygame.Surface:
         image = self.board.getImage()
-        pyg_image = pygame.image.fromstring(image.tobytes(), image.size, image.mode)
-        pyg_image = pygame.transform.scale(pyg_image, self.resized_content)
-        screen.blit(pyg_image, self.coord)
+        if image is not self.drawn_image:
+            self.drawn_image = image
+            pyg_image = pygame.image.fromstring(image.tobytes(), image.size, image.mode)
+            self.surface = scaleTo(pyg_image, self.resized_content)
+        return self.surface
+
+    def render(self, screen: pygame.Surface):
+        screen.blit(self.getSurface(), self.coord)
+
+    def getBlits(self) -> list[tuple] | None:
+        return [(self.getSurface(), self.coord)]
 
 
 class PresetRender(BoardRender):
@@ -136,21 +151,24 @@ class PresetRender(BoardRender):
         self.referer = referer
         super().__init__((0, 0), preset.getSize(), parent, preset)
         self.ratio = referer.ratio
-        self.size = tuple(math.floor(s * self.ratio) for s in preset.getSize())
+        c_w, c_h = preset.getSize()
+        self.setRect(self.coord, (int(c_w * self.ratio), int(c_h * self.ratio)))
+        self.resized_content = self.size
 
-    def handleEvents(self):
+    def handleEvents(self, events: list[pygame.event.Event]):
         if not mouseIn(*self.placement_box):
             return
-        for event in pygame.event.get([pygame.MOUSEBUTTONDOWN]):
+        for event in popEvents(events, pygame.MOUSEBUTTONDOWN):
             if event.button == 1:
                 Thread(target=lambda: self.referer.board.paste(self.board, *self.relative_coord)).start()
 
     def render(self, screen: pygame.Surface):
+        screen.blits(self.getBlits(), doreturn=False)
+
+    def getBlits(self) -> list[tuple] | None:
         if not mouseIn(*self.placement_box):
-            return
-        image = self.board.getImage()
-        pyg_image = pygame.image.fromstring(image.tobytes(), image.size, image.mode)
-        screen.blit(pygame.transform.scale(pyg_image, self.size), self.snap_coord)
+            return []
+        return [(self.getSurface(), self.snap_coord)]
 
     @property
     def placement_box(self) -> tuple[tuple[int, ...], tuple[int, ...]]:
@@ -161,7 +179,7 @@ class PresetRender(BoardRender):
 
     @property
     def relative_coord(self):
-        x, y = pygame.mouse.get_pos()
+        x, y = getMousePos()
         p_x, p_y = self.referer.coord
         ratio = self.referer.ratio
         c_w, c_h = self.board.getSize()
@@ -308,20 +326,17 @@ class PresetContainer(Container):
         self.referer.parent.clear(type=PresetRender)
         self.referer.parent.add(PresetRender(self, self.referer, self.preset))
 
-    def handleEvents(self):
-        if pygame.event.get([pygame.USEREVENT + pygame.K_r]):
+    def handleEvents(self, events: list[pygame.event.Event]):
+        if popEvents(events, pygame.KEYDOWN, pygame.K_r):
             self.rotatePreset()
         for child in [self.left_arrow, self.right_arrow, self.left_preset, self.right_preset]:
             if child is None:
                 continue
-            child.handleEvents()
+            child.handleEvents(events)
 
     def render(self, screen: pygame.Surface):
-        super().render(screen)
-        for child in [self.left_preset, self.right_preset, self.left_arrow, self.right_arrow]:
-            if child is None:
-                continue
-            child.render(screen)
+        extra_children = [self.left_preset, self.right_preset, self.left_arrow, self.right_arrow]
+        self.renderChildren(screen, self.children + [child for child in extra_children if child is not None])
 
 
 class SavePopup(Container):
@@ -360,15 +375,15 @@ class SavePopup(Container):
         self.add(Button((284, 48), self, ASSETS_PATH / 'buttons' / 'save.png', self.save))
         parent.add(self)
 
-    def handleEvents(self):
-        super().handleEvents()
-        for event in pygame.event.get([pygame.MOUSEBUTTONDOWN]):
+    def handleEvents(self, events: list[pygame.event.Event]):
+        super().handleEvents(events)
+        for event in popEvents(events, pygame.MOUSEBUTTONDOWN):
             if event.button == 1 and not mouseIn(self.coord, self.size):
                 self.close()
-        pygame.event.get()  # clear the event queue
+        events.clear()  # consume every event
 
     def close(self):
-        self.parent.children.remove(self)
+        self.cleanup()
 
     def save(self):
         board = self.referer.board
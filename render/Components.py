@@ -1,47 +1,215 @@
 import time
-import uuid
-from uuid import UUID
+import itertools
+from functools import lru_cache
 
 import pygame
 import math
+import numpy as np
 from pathlib import Path
-from render.Utils import fitRatio, centerCoord, mouseIn, cropText, scaledImage, scaledTab
+from render.Utils import fitRatio, centerCoord, cropText, popEvents, displayFormat, updateMousePos, getMousePos, scaleTo
+
+try:  # numba is optional, graphs fall back to numpy without it
+    from numba import njit
+except ImportError:
+    njit = None
 
 ASSETS_PATH = Path(__file__).parent.parent / 'assets'
 FONT_PATH: Path = ASSETS_PATH / 'font.ttf'
+# keys that Input writes as text
+TYPEABLE_KEYS: frozenset[int] = frozenset(
+    [*range(pygame.K_a, pygame.K_z + 1), *range(pygame.K_0, pygame.K_9 + 1), pygame.K_SPACE, pygame.K_UNDERSCORE]
+)
+# event types children react to, frames without them skip event dispatch
+HANDLED_EVENTS: frozenset[int] = frozenset((pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN))
+
+# unique ids given to children, only needs to be unique within the process
+child_uuids = itertools.count()
+# index of the frame being processed, used to invalidate per-frame caches
+current_frame: int = 0
+# areas of the screen drawn differently than in the last frame
+dirty_rects: list[pygame.Rect] = []
+
+
+def nextFrame():
+    """
+    Start a new frame, must be called once per iteration of the main loop.
+    """
+    global current_frame
+    current_frame += 1
+    updateMousePos()
+
+
+def markDirty(rect: pygame.Rect | tuple[int, ...] | None):
+    """
+    Mark an area of the screen as changed since the last frame.
+    """
+    if rect is not None:
+        dirty_rects.append(pygame.Rect(rect))
+
+
+def takeDirtyRects() -> list[pygame.Rect]:
+    """
+    Get the areas changed by the frame just rendered, overlapping ones merged, and start collecting for the next one.
+    """
+    rects = []
+    for rect in dirty_rects:
+        index = rect.collidelist(rects)
+        while index != -1:
+            rect.union_ip(rects.pop(index))
+            index = rect.collidelist(rects)
+        rects.append(rect)
+    dirty_rects.clear()
+    return rects
+
+
+def blitsArea(blits: list[tuple]) -> pygame.Rect | None:
+    """
+    Get the area covered by (surface, coord[, area]) blits, None if there are none.
+    """
+    rects = [
+        pygame.Rect(blit[1], pygame.Rect(blit[2]).size if len(blit) > 2 else blit[0].get_size())
+        for blit in blits
+    ]
+    if not rects:
+        return None
+    return rects[0].unionall(rects[1:])
+
+
+@lru_cache(maxsize=32)
+def getFont(size: int) -> pygame.font.Font:
+    """
+    Get the shared font instance for the given size, the TTF file is only parsed once per size.
+    """
+    return pygame.font.Font(str(FONT_PATH), size)
+
+
+def getScaledFont(size: int, ratio: float) -> pygame.font.Font:
+    """
+    Get the shared font rendering text directly at its size on screen, so it does not need to be scaled.
+    """
+    return getFont(max(1, int(size * ratio)))
+
+
+@lru_cache(maxsize=512)
+def renderText(font: pygame.font.Font, text: str, color: tuple[int, int, int]) -> pygame.Surface:
+    """
+    Render the text with the shared font, surfaces are reused by every widget showing the same text.
+    """
+    return displayFormat(font.render(text, False, color))
+
+
+def boldText(text: pygame.Surface) -> pygame.Surface:
+    """
+    Bake a black shadow under the rendered text, made from the same glyphs so the font only renders once.
+    """
+    combined = pygame.surface.Surface((text.get_width() + 2, text.get_height() + 2), pygame.SRCALPHA)
+    combined.fill((0, 0, 0, 0))
+    combined.blit(text, (2, 2))
+    # darken the glyphs into the shadow while keeping their alpha
+    combined.fill((0, 0, 0, 255), special_flags=pygame.BLEND_RGBA_MULT)
+    combined.blit(text, (0, 0))
+    return displayFormat(combined)
+
+
+@lru_cache(maxsize=128)
+def renderBoldText(font: pygame.font.Font, text: str, color: tuple[int, int, int]) -> pygame.Surface:
+    """
+    Render the text with its shadow baked under it, shared like renderText.
+    """
+    return boldText(displayFormat(font.render(text, False, color)))
+
+
+def xyToPixels(x_data: np.ndarray, y_data: np.ndarray,
+               x_min: float, x_scale: float, y_max: float, y_scale: float, out: np.ndarray):
+    """
+    Write the chart pixel of each (x, y) data point in the rows of out.
+    """
+    for i in range(len(x_data)):
+        out[i, 0] = math.floor((x_data[i] - x_min) * x_scale)
+        out[i, 1] = math.floor((y_max - y_data[i]) * y_scale)
+
+
+if njit is not None:
+    xyToPixels = njit(cache=True)(xyToPixels)
 
 
 class Child:
     coord: tuple[int, ...]
     size: tuple[int, ...]
+    # the same placement as plain ints, and as a (x, y, w, h) tuple
+    x: int
+    y: int
+    w: int
+    h: int
+    rect: tuple[int, ...]
     parent: 'Container'
     can_interact: bool = False
-    uuid: UUID
+    uuid: int
+    hitbox: pygame.Rect = None
+    hover_frame: int = -1
+    is_hovered: bool = False
+    # blits drawn last frame, to find out if the child changed
+    drawn_blits: list[tuple] | None = None
 
     def __init__(self, coord: tuple[int, ...], size: tuple[int, ...], parent: 'Container'):
         self.parent = parent
-        self.size = tuple(math.floor(s * parent.ratio) for s in size)
-        self.coord = tuple(math.floor(s * parent.ratio) + p for s, p in zip(coord, parent.coord))
-        self.uuid = uuid.uuid4()
-
-    def handleEvents(self):
+        ratio = parent.ratio
+        x, y = coord
+        p_x, p_y = parent.coord
+        self.setRect(
+            (int(x * ratio) + p_x, int(y * ratio) + p_y),
+            (int(size[0] * ratio), int(size[1] * ratio))
+        )
+        self.uuid = next(child_uuids)
+
+    def setRect(self, coord: tuple[int, ...], size: tuple[int, ...]):
+        """
+        Move and resize the child, keeping every form of its placement in sync.
+        """
+        self.coord = coord
+        self.size = size
+        self.x, self.y = coord
+        self.w, self.h = size
+        self.rect = (self.x, self.y, self.w, self.h)
+
+    def handleEvents(self, events: list[pygame.event.Event]):
         pass
 
     def render(self, screen: pygame.Surface):
         pass
 
-    @property
-    def rect(self) -> tuple:
-        return *self.coord, *self.size
+    def getBlits(self) -> list[tuple] | None:
+        """
+        Get the (surface, coord[, area]) blits drawn by this child, None if it needs its own render call.
+        Children rendering themselves must mark the areas they change with markDirty.
+        """
+        return None
+
+    def hovered(self) -> bool:
+        """
+        Check if the mouse is in the hitbox, only tested once per frame.
+        """
+        if self.hover_frame != current_frame:
+            self.hover_frame = current_frame
+            self.is_hovered = self.hitbox.collidepoint(getMousePos())
+        return self.is_hovered
 
     def cleanup(self):
-        self.parent.children.remove(self)
+        siblings = self.parent.typed_children[type(self)]
+        # transient children like popups are added last, look from the end and compare identities
+        for children in (self.parent.children, siblings):
+            for i in range(len(children) - 1, -1, -1):
+                if children[i] is self:
+                    del children[i]
+                    break
+        if not siblings:
+            del self.parent.typed_children[type(self)]
 
     def __eq__(self, other):
         return isinstance(other, self.__class__) and self.uuid == other.uuid
 
     def __hash__(self):
-        return hash(self.uuid)
+        return self.uuid
 
 
 class ScaledChild(Child):
@@ -52,15 +220,20 @@ class ScaledChild(Child):
                  content_size: tuple[int, ...], parent: 'Container'):
         self.ratio = fitRatio(size, content_size)
         self.content_size = content_size
-        content_size = tuple(math.floor(s * self.ratio) for s in content_size)
+        content_size = (int(content_size[0] * self.ratio), int(content_size[1] * self.ratio))
         super().__init__(coord, content_size, parent)
         self.ratio *= parent.ratio
-        self.coord = centerCoord(self.coord, tuple(math.floor(s * parent.ratio) for s in size), self.size)
+        allocated_size = (int(size[0] * parent.ratio), int(size[1] * parent.ratio))
+        self.setRect(centerCoord(self.coord, allocated_size, self.size), self.size)
 
 
 class Container(ScaledChild):
     background: pygame.Surface
     children: list[Child]
+    # the same children grouped by their exact type, in insertion order
+    typed_children: dict[type, list[Child]]
+    # children rendered last frame, the whole container is redrawn when they change
+    drawn_children: list[Child] | None = None
 
     def __init__(self, coord: tuple[int, ...], size: tuple[int, ...] | None,
                  parent: 'Container', bg: Path | pygame.Surface):
@@ -69,8 +242,10 @@ class Container(ScaledChild):
         if size is None:  # consider a 1:1 background with its parent
             size = bg.get_size()
         super().__init__(coord, size, bg.get_size(), parent)
-        self.background = pygame.transform.scale(bg, tuple(int(x * self.ratio) for x in bg.get_size()))
+        b_w, b_h = bg.get_size()
+        self.background = displayFormat(scaleTo(bg, (int(b_w * self.ratio), int(b_h * self.ratio))))
         self.children = []
+        self.typed_children = {}
 
     @staticmethod
     def fromScreen(screen: pygame.Surface, path: Path) -> 'Container':
@@ -81,249 +256,365 @@ class Container(ScaledChild):
     def unit(size: tuple = (0, 0)) -> 'Container':
         container: Container = object.__new__(Container)
         container.__class__ = Container
-        container.coord = (0, 0)
-        container.size = size
+        container.setRect((0, 0), size)
         container.ratio = 1
         return container
 
-    def handleEvents(self):
-        for child in self.children[::-1]:
-            child.handleEvents()
+    def handleEvents(self, events: list[pygame.event.Event]):
+        if not any(event.type in HANDLED_EVENTS for event in events):
+            return
+        for child in reversed(self.children):
+            child.handleEvents(events)
 
     def add(self, child):
         self.children.append(child)
+        self.typed_children.setdefault(type(child), []).append(child)
 
     def render(self, screen: pygame.Surface):
-        screen.blit(self.background, self.coord)
-        for child in self.children:
+        self.renderChildren(screen, self.children)
+
+    def renderChildren(self, screen: pygame.Surface, children: list[Child]):
+        """
+        Render the background and the children, marking what changed since the last frame.
+        """
+        drawn = self.drawn_children
+        if drawn is None or len(drawn) != len(children) or any(a is not b for a, b in zip(drawn, children)):
+            markDirty((self.coord, self.background.get_size()))
+            self.drawn_children = list(children)
+        # batch consecutive simple children in a single blits call
+        batch = [(self.background, self.coord)]
+        for child in children:
+            blits = child.getBlits()
+            if blits is not None:
+                if blits != child.drawn_blits:
+                    markDirty(blitsArea(blits + (child.drawn_blits or [])))
+                    child.drawn_blits = blits
+                batch.extend(blits)
+                continue
+            if batch:
+                screen.blits(batch, doreturn=False)
+                batch = []
             child.render(screen)
+        if batch:
+            screen.blits(batch, doreturn=False)
 
     def clear(self, type: type = None):
         if type is None:
             self.children.clear()
+            self.typed_children.clear()
             return
+        matching = self.matchingTypes(type)
+        if not matching:
+            return
+        for child_type in matching:
+            del self.typed_children[child_type]
         self.children = [c for c in self.children if not isinstance(c, type)]
 
     def get(self, type: type = None) -> list:
         if type is None:
             return self.children
+        matching = self.matchingTypes(type)
+        if len(matching) == 1:
+            return list(self.typed_children[matching[0]])
+        if not matching:
+            return []
+        # children of several types, keep the order they were added in
         return [c for c in self.children if isinstance(c, type)]
 
+    def matchingTypes(self, type: type) -> list[type]:
+        """
+        Get the types of the children that are instances of the given type.
+        """
+        return [child_type for child_type in self.typed_children if issubclass(child_type, type)]
+
 
 class StaticTextRender(Child):
     text: pygame.Surface
 
     def __init__(self, coord: tuple[int, ...], parent: 'Container',
                  text: str, color: tuple[int, int, int], font_size: int = 36, max_width: int = 0):
-        font = pygame.font.Font(str(FONT_PATH), font_size)
-        text = text if max_width == 0 else cropText(text, font, max_width)
-        self.text = font.render(text, False, color)
-        size = self.text.get_size()
-        super().__init__(coord, size, parent)
-        self.text = pygame.transform.scale(self.text, self.size)
+        font = getScaledFont(font_size, parent.ratio)
+        text = text if max_width == 0 else cropText(text, font, int(max_width * parent.ratio))
+        self.text = displayFormat(font.render(text, False, color))
+        super().__init__(coord, (0, 0), parent)
+        # the text is already at its size on screen, only the coordinate is scaled
+        self.setRect(self.coord, self.text.get_size())
 
     def render(self, screen: pygame.Surface):
         screen.blit(self.text, self.coord)
 
+    def getBlits(self) -> list[tuple] | None:
+        return [(self.text, self.coord)]
+
 
 class BoldStaticTextRender(StaticTextRender):
-    under_text: pygame.Surface
 
     def __init__(self, coord: tuple[int, ...], parent: 'Container',
                  text: str, color: tuple[int, int, int], font_size: int = 36, max_width: int = 0):
-        font = pygame.font.Font(str(FONT_PATH), font_size)
-        text = text if max_width == 0 else cropText(text, font, max_width)
+        font = getScaledFont(font_size, parent.ratio)
+        text = text if max_width == 0 else cropText(text, font, int(max_width * parent.ratio))
         super().__init__(coord, parent, text, color, font_size)
-        self.under_text = font.render(text, False, (0, 0, 0))
-        self.under_text = pygame.transform.scale(self.under_text, self.size)
-
-    def render(self, screen: pygame.Surface):
-        screen.blit(self.under_text, (self.coord[0] + 2, self.coord[1] + 2))
-        super().render(screen)
+        # bake the shadow under the text so it is drawn with a single blit
+        self.text = boldText(self.text)
 
 
 class DynamicTextRender(Child):
     font: pygame.font.Font
     color: tuple[int, int, int]
     text_getter: callable
+    # maximum width of the text on screen, 0 for no limit
     max_width: int
+    # content returned by the getter last frame and its surface, reused while it does not change
+    last_content: str = None
+    last_text: pygame.Surface = None
 
     def __init__(self, coord: tuple[int, ...], parent: 'Container',
                  color: tuple[int, int, int], text_getter: callable, font_size: int = 36, max_width: int = 0):
         self.color = color
         self.text_getter = text_getter
-        self.font = pygame.font.Font(str(FONT_PATH), font_size)
-        self.max_width = max_width
+        self.font = getScaledFont(font_size, parent.ratio)
+        self.max_width = int(max_width * parent.ratio)
         super().__init__(coord, (0, 0), parent)
 
-    def render(self, screen: pygame.Surface):
+    def getContent(self, content: str) -> str:
+        return content if self.max_width == 0 else cropText(content, self.font, self.max_width)
+
+    def getText(self) -> pygame.Surface:
         content = self.text_getter()
-        content = content if self.max_width == 0 else cropText(content, self.font, self.max_width)
-        text = self.font.render(content, False, self.color)
-        size = tuple(int(s * self.parent.ratio) for s in text.get_size())
-        text = pygame.transform.scale(text, size)
-        screen.blit(text, self.coord)
+        if content != self.last_content:
+            self.last_content = content
+            self.last_text = self.makeText(self.getContent(content), self.color)
+        return self.last_text
+
+    def makeText(self, content: str, color: tuple[int, int, int]) -> pygame.Surface:
+        return renderText(self.font, content, color)
+
+    def render(self, screen: pygame.Surface):
+        screen.blit(self.getText(), self.coord)
+
+    def getBlits(self) -> list[tuple] | None:
+        return [(self.getText(), self.coord)]
 
 
 class BoldDynamicTextRender(DynamicTextRender):
 
-    def render(self, screen: pygame.Surface):
-        content = self.text_getter()
-        content = content if self.max_width == 0 else cropText(content, self.font, self.max_width)
-        text = self.font.render(content, False, (0, 0, 0))
-        size = tuple(int(s * self.parent.ratio) for s in text.get_size())
-        text = pygame.transform.scale(text, size)
-        screen.blit(text, (self.coord[0] + 2, self.coord[1] + 2))
-        super().render(screen)
+    def makeText(self, content: str, color: tuple[int, int, int]) -> pygame.Surface:
+        # compose the shadow and the text in a single surface to only blit once on the screen
+        return renderBoldText(self.font, content, color)
 
 
 class Button(Child):
-    base: pygame.Surface
-    hover: pygame.Surface
-    click: pygame.Surface = None
-    disable: pygame.Surface = None
+    # every variant of the button side by side in a single surface
+    atlas: pygame.Surface
+    variant_areas: dict[str, pygame.Rect]
+    base: pygame.Rect
+    hover: pygame.Rect
+    click: pygame.Rect = None
+    disable: pygame.Rect = None
     dark_text: pygame.Surface = None
     light_text: pygame.Surface = None
+    # (surface, coord) pairs of the centered text, built once
+    dark_foreground: tuple[pygame.Surface, tuple[int, ...]] = None
+    light_foreground: tuple[pygame.Surface, tuple[int, ...]] = None
     background_size: tuple[int, int]
     callback: callable
     can_interact: bool = True
     disabled: bool = False
+    # atlas areas indexed by the packed (disabled, hovered, pressed) state bits
+    state_table: tuple[pygame.Rect, ...]
 
     def __init__(self, coord: tuple[int, ...], parent: 'Container', path: Path, callback: callable,
                  has_pressed: bool = True, disabled: bool = False, text: str = None):
-        image = Button.getVariant(path, 'base')  # used to get the size
-        super().__init__(coord, image.get_size(), parent)
+        variants = self.getVariants(path, has_pressed, disabled)
+        atlas = Button.loadAtlas(tuple(variants.values()))
+        b_w, b_h = atlas.get_width() // len(variants), atlas.get_height()
+        super().__init__(coord, (b_w, b_h), parent)
+        self.hitbox = pygame.Rect(self.rect)
         self.callback = callback
-        self.base = pygame.transform.scale(image, self.size)
-        self.hover = pygame.transform.scale(Button.getVariant(path, 'hover'), self.size)
-        if has_pressed:  # if the button has a pressed state
-            self.click = pygame.transform.scale(Button.getVariant(path, 'click'), self.size)
+        # scale each variant into its own slot, then address each of them by its area
+        width, height = self.size
+        self.atlas = pygame.surface.Surface((width * len(variants), height), pygame.SRCALPHA)
+        self.variant_areas = {}
+        for i, name in enumerate(variants):
+            image = atlas.subsurface(pygame.Rect(i * b_w, 0, b_w, b_h))
+            self.atlas.blit(scaleTo(image, self.size), (i * width, 0),
+                            special_flags=pygame.BLEND_RGBA_MAX)
+            self.variant_areas[name] = pygame.Rect(i * width, 0, width, height)
+        self.atlas = displayFormat(self.atlas)
+        self.base = self.variant_areas['base']
+        self.hover = self.variant_areas['hover']
+        self.click = self.variant_areas.get('click')
         if disabled:
             self.disabled = disabled
-            try:
-                self.disable = pygame.transform.scale(Button.getVariant(path, 'disable'), self.size)
-            except FileNotFoundError:
-                print('ignoring disable texture as it was not found')
+            self.disable = self.variant_areas.get('disable')
         if text is not None:
-            b_w, b_h = image.get_size()
-            font = pygame.font.Font(str(FONT_PATH), b_h - 10)
-            text = cropText(text, font, b_w - 6)
+            ratio = self.parent.ratio
+            font = getScaledFont(b_h - 10, ratio)
+            text = cropText(text, font, int((b_w - 6) * ratio))
             self.light_text = font.render(text, False, (255, 255, 255))
             self.dark_text = font.render(text, False, (0, 0, 0))
-            size = tuple(int(s * self.parent.ratio) for s in self.light_text.get_size())
-            self.light_text = pygame.transform.scale(self.light_text, size)
-            self.dark_text = pygame.transform.scale(self.dark_text, size)
+            self.light_text = displayFormat(self.light_text)
+            self.dark_text = displayFormat(self.dark_text)
+            t_w, t_h = self.light_text.get_size()
+            text_coord = (self.x + (self.w - t_w) // 2, self.y + (self.h - t_h) // 2)
+            self.light_foreground = (self.light_text, text_coord)
+            self.dark_foreground = (self.dark_text, text_coord)
+        disable = self.disable or self.base
+        self.state_table = (
+            self.base, self.base, self.hover, self.click or self.hover,
+            disable, disable, disable, disable
+        )
+
+    def getVariants(self, path: Path, has_pressed: bool, disabled: bool) -> dict[str, tuple[Path, str]]:
+        """
+        Get the (path, variant) of each texture used by the button, by name.
+        """
+        variants = {'base': (path, 'base'), 'hover': (path, 'hover')}
+        if has_pressed:  # if the button has a pressed state
+            variants['click'] = (path, 'click')
+        if disabled:
+            if Button.variantPath(path, 'disable').exists():
+                variants['disable'] = (path, 'disable')
+            else:
+                print('ignoring disable texture as it was not found')
+        return variants
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def loadAtlas(variants: tuple[tuple[Path, str], ...]) -> pygame.Surface:
+        """
+        Load the given variants side by side in a single surface, all at the size of the first one.
+        """
+        images = [Button.getVariant(path, variant) for path, variant in variants]
+        width, height = images[0].get_size()
+        atlas = pygame.surface.Surface((width * len(images), height), pygame.SRCALPHA)
+        for i, image in enumerate(images):
+            image = scaleTo(image, (width, height))
+            # copy the pixels as is onto the transparent atlas, colorkeyed images skip their transparent pixels
+            flags = pygame.BLEND_RGBA_MAX if image.get_flags() & pygame.SRCALPHA else 0
+            atlas.blit(image, (i * width, 0), special_flags=flags)
+        return atlas
+
+    @staticmethod
+    def variantPath(path: Path, variant: str) -> Path:
+        return path.parent / (path.stem + f'_{variant}' + path.suffix)
 
     @staticmethod
     def getVariant(path: Path, variant: str) -> pygame.Surface:
-        return pygame.image.load(path.parent / (path.stem + f'_{variant}' + path.suffix))
+        return pygame.image.load(Button.variantPath(path, variant))
 
-    def handleEvents(self):
-        if not mouseIn(self.coord, self.size) or self.disabled:
+    def handleEvents(self, events: list[pygame.event.Event]):
+        if self.disabled or not self.hovered():
             return
-        for event in pygame.event.get([pygame.MOUSEBUTTONDOWN]):
+        for event in popEvents(events, pygame.MOUSEBUTTONDOWN):
             if event.button == 1:
                 self.callback()
 
-    @property
-    def background(self) -> pygame.Surface:
-        if self.disable and self.disabled:
-            return self.disable
-        if mouseIn(self.coord, self.size) and not self.disabled:
-            return self.click if pygame.mouse.get_pressed()[0] and self.click is not None else self.hover
-        return self.base
+    def getBackground(self, hovered: bool, pressed: bool) -> pygame.Rect:
+        """
+        Area of the atlas to draw for the given mouse state.
+        """
+        return self.state_table[self.disabled << 2 | hovered << 1 | pressed]
 
-    @property
-    def foreground(self) -> tuple[pygame.surface, tuple[int, ...]] | None:
+    def getForeground(self, hovered: bool, pressed: bool) -> tuple[pygame.surface, tuple[int, ...]] | None:
         if self.light_text is None:
             return None
-        coord = centerCoord(
-            self.coord,
-            self.size,
-            self.light_text.get_size()
-        )
-        if self.disabled or (mouseIn(self.coord, self.size) and pygame.mouse.get_pressed()[0]):
-            return self.light_text, coord
-        return self.dark_text, coord
+        if self.disabled or (hovered and pressed):
+            return self.light_foreground
+        return self.dark_foreground
 
     def render(self, screen: pygame.Surface):
-        screen.blit(self.background, self.coord)
-        if self.foreground:
-            screen.blit(*self.foreground)
+        screen.blits(self.getBlits(), doreturn=False)
+
+    def getBlits(self) -> list[tuple] | None:
+        # read the mouse state once for both layers
+        hovered = self.hovered()
+        pressed = pygame.mouse.get_pressed()[0]
+        foreground = self.getForeground(hovered, pressed)
+        if foreground is None:
+            return [(self.atlas, self.coord, self.getBackground(hovered, pressed))]
+        return [(self.atlas, self.coord, self.getBackground(hovered, pressed)), foreground]
 
 
 class RadioButton(Button):
     selected: bool
-    selected_base: pygame.Surface
+    selected_base: pygame.Rect
 
     def __init__(self, coord: tuple[int, ...], parent: 'Container', path: Path,
                  callback: callable, selected: bool = False, disabled: bool = False, text: str = None):
         self.selected = selected
         super().__init__(coord, parent, path, callback, False, disabled, text)
-        self.selected_base = pygame.transform.scale(Button.getVariant(path, 'selected'), self.size)
+        self.selected_base = self.variant_areas['selected']
+        # packed as (disabled, hovered, selected)
+        disable = self.disable or self.base
+        disable_selected = self.disable or self.selected_base
+        self.state_table = (
+            self.base, self.selected_base, self.hover, self.selected_base,
+            disable, disable_selected, disable, disable_selected
+        )
+
+    def getVariants(self, path: Path, has_pressed: bool, disabled: bool) -> dict[str, tuple[Path, str]]:
+        variants = super().getVariants(path, has_pressed, disabled)
+        variants['selected'] = (path, 'selected')
+        return variants
 
-    def handleEvents(self):
-        if not mouseIn(self.coord, self.size) or self.disabled or self.selected:
+    def handleEvents(self, events: list[pygame.event.Event]):
+        if self.disabled or self.selected or not self.hovered():
             return
-        for event in pygame.event.get([pygame.MOUSEBUTTONDOWN]):
+        for event in popEvents(events, pygame.MOUSEBUTTONDOWN):
             if event.button == 1:
                 self.selected = True
                 self.callback()
 
-    @property
-    def background(self) -> pygame.Surface:
-        if self.disabled and self.disable:
-            return self.disable
-        if mouseIn(self.coord, self.size) and not self.disabled and not self.selected:
-            return self.hover
-        return self.selected_base if self.selected else self.base
+    def getBackground(self, hovered: bool, pressed: bool) -> pygame.Rect:
+        return self.state_table[self.disabled << 2 | hovered << 1 | self.selected]
 
 
 class ToggleButton(Button):
     on: bool
-    on_base: pygame.Surface
-    on_hover: pygame.Surface
+    on_path: Path
+    on_base: pygame.Rect
+    on_hover: pygame.Rect
 
     def __init__(self, coord: tuple[int, ...], parent: 'Container', path: Path,
                  callback: callable, on: bool = False, disabled: bool = False, text: str = None):
         self.on = on
+        self.on_path = path
         super().__init__(
             coord, parent,
             path.parent / f'{path.stem}_off{path.suffix}',
             callback, False,
             disabled, text
         )
-        self.on_base = pygame.transform.scale(Button.getVariant(path, 'on_base'), self.size)
-        self.on_hover = pygame.transform.scale(Button.getVariant(path, 'on_hover'), self.size)
+        self.on_base = self.variant_areas['on_base']
+        self.on_hover = self.variant_areas['on_hover']
+        # packed as (disabled, hovered, on)
+        disable = self.disable or self.base
+        disable_on = self.disable or self.on_base
+        self.state_table = (
+            self.base, self.on_base, self.hover, self.on_hover,
+            disable, disable_on, disable, disable_on
+        )
+
+    def getVariants(self, path: Path, has_pressed: bool, disabled: bool) -> dict[str, tuple[Path, str]]:
+        variants = super().getVariants(path, has_pressed, disabled)
+        variants['on_base'] = (self.on_path, 'on_base')
+        variants['on_hover'] = (self.on_path, 'on_hover')
+        return variants
 
-    def handleEvents(self):
-        if not mouseIn(self.coord, self.size) or self.disabled:
+    def handleEvents(self, events: list[pygame.event.Event]):
+        if self.disabled or not self.hovered():
             return
-        for event in pygame.event.get([pygame.MOUSEBUTTONDOWN]):
+        for event in popEvents(events, pygame.MOUSEBUTTONDOWN):
             if event.button == 1:
                 self.on = not self.on
                 self.callback(self.on)
 
-    @property
-    def background(self) -> pygame.Surface:
-        if self.disabled and self.disable:
-            return self.disable
-        if mouseIn(self.coord, self.size) and not self.disabled:
-            return self.on_hover if self.on else self.hover
-        return self.on_base if self.on else self.base
+    def getBackground(self, hovered: bool, pressed: bool) -> pygame.Rect:
+        return self.state_table[self.disabled << 2 | hovered << 1 | self.on]
 
-    @property
-    def foreground(self) -> tuple[pygame.surface, tuple[int, ...]] | None:
-        if self.light_text is None:
-            return None
-        coord = centerCoord(
-            self.coord,
-            self.size,
-            self.light_text.get_size()
-        )
-        if self.on:
-            return self.light_text, coord
-        return self.dark_text, coord
+    def getForeground(self, hovered: bool, pressed: bool) -> tuple[pygame.surface, tuple[int, ...]] | None:
+        return self.light_foreground if self.on else self.dark_foreground
 
 
 class Input(Child):
@@ -335,9 +626,16 @@ class Input(Child):
     editing: bool
     bg: pygame.Surface
     bg_edit: pygame.Surface
+    # scaled placement of the text, constant for the parent ratio
+    under_text_coord: tuple[float, float]
+    text_coord: tuple[float, float]
+    visible_width: int
+    # (text, editing) state the blits were last built for
+    last_state: tuple[str, bool] = None
+    last_blits: list[tuple]
 
     def __init__(self, coord: tuple[int, ...], parent: 'Container', on_validate: callable, suggestion: str, max_width: int, font_size: int = 36):
-        self.font = pygame.font.Font(str(FONT_PATH), font_size)
+        self.font = getScaledFont(font_size, parent.ratio)
         self.on_validate = on_validate
         self.suggestion = suggestion
         self.text = ''
@@ -345,137 +643,185 @@ class Input(Child):
         self.editing = False
         bg_size = (max_width + 6, font_size + 6)
         super().__init__(coord, bg_size, parent)
+        self.hitbox = pygame.Rect(self.rect)
+        ratio = parent.ratio
+        self.under_text_coord = (self.x + 5 * ratio, self.y + 5 * ratio)
+        self.text_coord = (self.x + 3 * ratio, self.y + 3 * ratio)
+        self.visible_width = int(max_width * ratio)
         self.bg = pygame.surface.Surface(bg_size)
         self.bg.fill((160, 160, 160))
         pygame.draw.rect(self.bg, (0, 0, 0), (1, 1, bg_size[0] - 2, bg_size[1] - 2))
-        self.bg = pygame.transform.scale(self.bg, self.size)
+        self.bg = displayFormat(scaleTo(self.bg, self.size), False)
 
         self.bg_edit = pygame.surface.Surface(bg_size)
         self.bg_edit.fill((252, 252, 252))
         pygame.draw.rect(self.bg_edit, (0, 0, 0), (1, 1, bg_size[0] - 2, bg_size[1] - 2))
-        self.bg_edit = pygame.transform.scale(self.bg_edit, self.size)
+        self.bg_edit = displayFormat(scaleTo(self.bg_edit, self.size), False)
 
-    def handleEvents(self):
+    def handleEvents(self, events: list[pygame.event.Event]):
+        hovered = self.hovered()
         # enter editing context
-        if not self.editing and mouseIn(self.coord, self.size):
-            for event in pygame.event.get([pygame.MOUSEBUTTONDOWN]):
+        if not self.editing and hovered:
+            for event in popEvents(events, pygame.MOUSEBUTTONDOWN):
                 if event.button == 1:
                     self.editing = True
 
-        # quit editing context
-        elif self.editing and not mouseIn(self.coord, self.size):
-            for event in pygame.event.get([pygame.MOUSEBUTTONDOWN]):
-                if event.button == 1:
+        # quit editing context, leaving the click to be consumed by a button
+        elif self.editing and not hovered:
+            for event in events:
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     self.editing = False
-                pygame.event.post(event)  # might get consumed by button click
 
         if self.editing:
-            for event in pygame.event.get([pygame.KEYDOWN]):
-                if (pygame.K_a <= event.key <= pygame.K_z
-                        or pygame.K_0 <= event.key <= pygame.K_9
-                        or event.key in [pygame.K_SPACE, pygame.K_UNDERSCORE]):
+            for event in popEvents(events, pygame.KEYDOWN):
+                if event.key in TYPEABLE_KEYS:
                     self.text += event.unicode
                 elif event.key == pygame.K_BACKSPACE:
                     self.text = self.text[:-1]
                 elif event.key == pygame.K_RETURN:
                     self.editing = False
                     self.on_validate(self.text)
-                else:  # resubmit unused events
-                    pygame.event.post(event)
-                    continue
-                # consume key specific event
-                pygame.event.get([pygame.USEREVENT + event.key])
+                else:  # give back unused events
+                    events.append(event)
 
     def visibleRect(self, text_surface: pygame.Surface) -> tuple[int, int, int, int]:
+        t_w, t_h = text_surface.get_size()
         if not self.editing:
-            return (
-                0,
-                0,
-                min(text_surface.get_size()[0], math.floor(self.max_width * self.parent.ratio)),
-                text_surface.get_size()[1]
-            )
-        return (
-            max(0, text_surface.get_size()[0] - math.floor(self.max_width * self.parent.ratio)),
-            0,
-            text_surface.get_size()[0],
-            text_surface.get_size()[1]
-        )
+            return 0, 0, min(t_w, self.visible_width), t_h
+        return max(0, t_w - self.visible_width), 0, t_w, t_h
 
     def render(self, screen: pygame.Surface):
-        screen.blit(self.bg_edit if self.editing else self.bg, self.coord)
+        screen.blits(self.getBlits(), doreturn=False)
 
+    def getBlits(self) -> list[tuple] | None:
+        state = (self.text, self.editing)
+        if state == self.last_state:
+            return self.last_blits
         content = self.suggestion if len(self.text) == 0 else self.text
 
-        under_text = self.font.render(content, False, (62, 62, 62))
-        text = self.font.render(content, False, (91, 91, 91) if len(self.text) == 0 else (252, 252, 252))
-        size = tuple(int(s * self.parent.ratio) for s in text.get_size())
-        under_text = pygame.transform.scale(under_text, size)
-        text = pygame.transform.scale(text, size)
+        under_text = renderText(self.font, content, (62, 62, 62))
+        text = renderText(self.font, content, (91, 91, 91) if len(self.text) == 0 else (252, 252, 252))
 
-        screen.blit(
-            under_text,
-            tuple(c + 5 * self.parent.ratio for c in self.coord),
-            self.visibleRect(under_text)
-        )
-        screen.blit(
-            text,
-            tuple(c + 3 * self.parent.ratio for c in self.coord),
-            self.visibleRect(text)
-        )
+        visible_rect = self.visibleRect(text)  # both texts have the same size
+        self.last_state = state
+        self.last_blits = [
+            (self.bg_edit if self.editing else self.bg, self.coord),
+            (under_text, self.under_text_coord, visible_rect),
+            (text, self.text_coord, visible_rect)
+        ]
+        return self.last_blits
 
 
 class Graph(Child):
     class DataSet:
-        data: list[int]
+        max_size: int = 5000
+        # ring buffer written twice (at i and i + max_size) so the data is always a contiguous slice
+        buffer: np.ndarray
+        start: int
+        length: int
+        pixels: np.ndarray
         color: tuple[int, int, int]
         span_x: float
         max_percent: float
         last_images: pygame.Surface | None
+        # state the cached image was drawn with, to extend it instead of redrawing everything
+        version: int = 0
+        last_key: tuple | None = None
+        last_version: int = 0
+        last_x: float = None
+        last_point: tuple[int, int] = None
         visible: bool
 
         def __init__(self, data: list[int] = None, color: tuple[int, int, int] = None, max_percent: float = None):
+            self.buffer = np.zeros(self.max_size * 2, dtype=np.float64)
+            self.pixels = np.empty((self.max_size, 2), dtype=np.int32)
             self.data = [] if data is None else data
             self.color = color
             self.max_percent = 1 + (0 if max_percent is None else max_percent)
             self.last_images = None
             self.visible = True
 
+        @property
+        def data(self) -> np.ndarray:
+            """
+            View on the stored points, from the oldest to the newest.
+            """
+            start = self.start
+            return self.buffer[start:start + self.length]
+
+        @data.setter
+        def data(self, data: list[int] | np.ndarray):
+            data = np.asarray(data, dtype=np.float64)[-self.max_size:]
+            self.start = 0
+            self.length = len(data)
+            self.buffer[:self.length] = data
+            self.buffer[self.max_size:self.max_size + self.length] = data
+            self.last_images = None
+
         def changeVisibility(self, visible: bool):
             self.visible = visible
             self.last_images = None
 
         def push(self, point: int):
-            self.data.append(point)
-            # Remove some old data if too much
-            if len(self.data) > 5000:
-                self.data.pop(0)
-
-            # Reset the image cache if needed
-            if self.visible:
-                self.last_images = None
-
-        def getImage(self, chart_size: tuple[int, ...], bounds: tuple[float, float, float, float], x_data: list[int]) -> pygame.Surface:
-            if self.last_images is not None:
-                return self.last_images
-            image = pygame.surface.Surface(chart_size, pygame.SRCALPHA)
-            image.fill((0, 0, 0, 0))
+            index = (self.start + self.length) % self.max_size
+            self.buffer[index] = point
+            self.buffer[index + self.max_size] = point
+            # Drop the oldest point if too much data
+            if self.length < self.max_size:
+                self.length += 1
+            else:
+                self.start = (self.start + 1) % self.max_size
+            self.version += 1
+
+        def getImage(self, chart_size: tuple[int, ...], bounds: tuple[float, float, float, float], x_data: np.ndarray) -> pygame.Surface:
             if not self.visible:
-                self.last_images = image
-                return image
+                if self.last_images is None:
+                    self.last_images = pygame.surface.Surface(chart_size, pygame.SRCALPHA)
+                    self.last_images.fill((0, 0, 0, 0))
+                return self.last_images
 
             x_scale = chart_size[0] / (bounds[1] - bounds[0])
             y_scale = chart_size[1] / (bounds[3] - bounds[2]) if bounds[3] - bounds[2] != 0 else 1
+            y_data = self.data
+            count = min(len(x_data), len(y_data))
+            key = (chart_size, bounds)
+
+            if self.last_images is not None and count > 1 and key == self.last_key:
+                # nothing new since the last draw
+                if self.version == self.last_version and x_data[-1] == self.last_x:
+                    return self.last_images
+                # both sets moved by exactly one point, only the new segment has to be drawn
+                if self.version == self.last_version + 1 and x_data[-2] == self.last_x:
+                    point = (
+                        math.floor((x_data[-1] - bounds[0]) * x_scale),
+                        math.floor((bounds[3] - y_data[-1]) * y_scale)
+                    )
+                    pygame.draw.line(self.last_images, self.color, self.last_point, point, 2)
+                    self.last_version = self.version
+                    self.last_x = x_data[-1]
+                    self.last_point = point
+                    return self.last_images
+
+            image = pygame.surface.Surface(chart_size, pygame.SRCALPHA)
+            image.fill((0, 0, 0, 0))
 
-            last_point = None
-            for x, y in zip(x_data[::-1], self.data[::-1]):
-                x = math.floor((x - bounds[0]) * x_scale)
-                y = math.floor((bounds[3] - y) * y_scale)
-                point = (x, y)
-                if last_point is not None:
-                    pygame.draw.line(image, self.color, last_point, point, 2)
-                last_point = point
+            # align both sets on their most recent points
+            x_data = x_data[len(x_data) - count:]
+            y_data = y_data[len(y_data) - count:]
+            pixels = self.pixels[:count]
+            if njit is not None:
+                xyToPixels(x_data, y_data, bounds[0], x_scale, bounds[3], y_scale, pixels)
+            else:
+                pixels[:, 0] = np.floor((x_data - bounds[0]) * x_scale)
+                pixels[:, 1] = np.floor((bounds[3] - y_data) * y_scale)
+            if count > 1:
+                pygame.draw.lines(image, self.color, False, pixels.tolist(), 2)
 
             self.last_images = image
+            self.last_key = key
+            self.last_version = self.version
+            self.last_x = x_data[-1] if count > 0 else None
+            self.last_point = tuple(pixels[-1].tolist()) if count > 0 else None
             return image
 
     x_set: DataSet
@@ -487,6 +833,12 @@ class Graph(Child):
     chart_size: tuple[int, ...]
     x_label_count: int
     y_label_count: int
+    # (bounds, blits) of the labels last drawn on each axis
+    x_labels: tuple[tuple[float, float] | None, list] = (None, [])
+    y_labels: tuple[tuple[float, float] | None, list] = (None, [])
+    # area and state drawn last frame, labels can go past the rect
+    drawn_area: pygame.Rect | None = None
+    drawn_state: tuple | None = None
 
     def __init__(self, coord: tuple[int, ...], size: tuple[int, ...], parent: 'Container',
                  x_set: DataSet, span_x, y_sets: list[DataSet],
@@ -501,10 +853,11 @@ class Graph(Child):
         self.y_label_count = y_label_count
         self.bg = pygame.surface.Surface(self.size, pygame.SRCALPHA)
         self.bg.fill((0, 0, 0, 0))
-        self.font = pygame.font.Font(str(FONT_PATH), font_size)
+        self.font = getFont(font_size)
 
         example_text = self.font.render('000.0', False, (192, 192, 192))
-        borders = list(math.floor(o * self.parent.ratio) for o in (5, 5, 5, 2))
+        ratio = self.parent.ratio
+        borders = [int(5 * ratio), int(5 * ratio), int(5 * ratio), int(2 * ratio)]
         borders[0] += example_text.get_size()[0]
         borders[1] += example_text.get_size()[1]
         rect = (
@@ -515,6 +868,7 @@ class Graph(Child):
         )
         pygame.draw.rect(self.bg, (255, 255, 255), (rect[0] - 2, rect[1] - 2, rect[2] + 4, rect[3] + 4), 2)
         pygame.draw.rect(self.bg, (0, 0, 0, 0), (rect[0], rect[1] - 2, rect[2] + 2, rect[3] + 2))
+        self.bg = displayFormat(self.bg)
 
         self.chart_coord = (self.coord[0] + borders[0], self.coord[1] + borders[3])
         self.chart_size = tuple(s - l - r for s, l, r in zip(self.size, borders[0:2], borders[2:4]))
@@ -524,43 +878,67 @@ class Graph(Child):
         screen.blit(self.bg, self.coord)
 
         if len(self.x_set.data) < 1 or all(not s.visible or len(s.data) < 1 for s in self.y_sets):
+            self.markChanged((), pygame.Rect(self.rect))
             return
 
-        # draw data lines
-        x_min = max(0, max(self.x_set.data) - self.span_x)
+        # draw data lines, x values are sorted so the newest is the last and the window can be bisected
+        x_data = self.x_set.data
+        x_min = max(0, x_data[-1] - self.span_x)
         x_max = x_min + self.span_x
-        x_data = [d for d in self.x_set.data if x_min <= d <= x_max]
+        x_data = x_data[np.searchsorted(x_data, x_min, side='left'):]
         data_points = len(x_data)
 
-        y_min = min(0, min([min(s.data[-data_points:]) for s in self.y_sets if s.visible and len(s.data) > 0]))
-        y_max = max([max(s.data[-data_points:]) * s.max_percent for s in self.y_sets if s.visible and len(s.data) > 0])
+        visible_sets = [s for s in self.y_sets if s.visible and len(s.data) > 0]
+        y_min = min(0, min(s.data[-data_points:].min() for s in visible_sets))
+        y_max = max(s.data[-data_points:].max() * s.max_percent for s in visible_sets)
         if y_min == y_max:
             y_max += 1
             y_min -= 0.01
+        bounds = (x_min, x_max, y_min, y_max)
+        images = []
         for s in self.y_sets:
-            screen.blit(s.getImage(self.chart_size, (x_min, x_max, y_min, y_max), x_data), self.chart_coord)
-
-        # X draw labels
-        for coord, value in Graph.getLabels(self.chart_size[0], x_min, x_max, self.x_label_count + 1):
-            x_text = self.font.render(value, False, (192, 192, 192))
-            screen.blit(
-                x_text,
-                (
-                    self.chart_coord[0] + coord - x_text.get_size()[0] / 2,
-                    self.chart_coord[1] + self.chart_size[1] + (3 * self.parent.ratio) + 2
-                )
-            )
+            image = s.getImage(self.chart_size, bounds, x_data)
+            screen.blit(image, self.chart_coord)
+            # images are extended in place, their version tells if they were drawn on
+            images.append((image, s.last_version, s.last_x))
+
+        # X draw labels, only placed again when the bounds change
+        if self.x_labels[0] != (x_min, x_max):
+            left = self.chart_coord[0]
+            top = self.chart_coord[1] + self.chart_size[1] + (3 * self.parent.ratio) + 2
+            blits = []
+            for coord, value in Graph.getLabels(self.chart_size[0], x_min, x_max, self.x_label_count + 1):
+                x_text = renderText(self.font, value, (192, 192, 192))
+                blits.append((x_text, (left + coord - x_text.get_width() / 2, top)))
+            self.x_labels = ((x_min, x_max), blits)
+        screen.blits(self.x_labels[1], doreturn=False)
 
         # Y draw labels
-        for coord, value in Graph.getLabels(self.chart_size[1], y_min, y_max, self.y_label_count + 1):
-            y_text = self.font.render(value, False, (192, 192, 192))
-            screen.blit(
-                y_text,
-                (
-                    self.chart_coord[0] - y_text.get_size()[0] - 2 - 3 * self.parent.ratio,
-                    self.chart_coord[1] + self.chart_size[1] - coord
-                )
-            )
+        if self.y_labels[0] != (y_min, y_max):
+            left = self.chart_coord[0]
+            bottom = self.chart_coord[1] + self.chart_size[1]
+            margin = 3 * self.parent.ratio
+            blits = []
+            for coord, value in Graph.getLabels(self.chart_size[1], y_min, y_max, self.y_label_count + 1):
+                y_text = renderText(self.font, value, (192, 192, 192))
+                blits.append((y_text, (left - y_text.get_width() - 2 - margin, bottom - coord)))
+            self.y_labels = ((y_min, y_max), blits)
+        screen.blits(self.y_labels[1], doreturn=False)
+
+        area = pygame.Rect(self.rect)
+        labels_area = blitsArea(self.x_labels[1] + self.y_labels[1])
+        if labels_area is not None:
+            area.union_ip(labels_area)
+        self.markChanged((self.x_labels[0], self.y_labels[0], images), area)
+
+    def markChanged(self, state: tuple, area: pygame.Rect):
+        """
+        Mark the graph dirty if it is drawn differently than last frame, along with the area it covered then.
+        """
+        if state != self.drawn_state:
+            markDirty(area if self.drawn_area is None else area.union(self.drawn_area))
+            self.drawn_state = state
+        self.drawn_area = area
 
     @staticmethod
     def getLabels(width, min_value: float, max_value: float, count: int) -> list[(int, str)]:
@@ -1,19 +1,83 @@
 import pygame
+from functools import lru_cache
 from pathlib import Path
 
+# mouse position of the frame being processed
+mouse_pos: tuple[int, int] = (0, 0)
+
 
 def fitRatio(parent_shape: tuple[int, ...], fit_shape: tuple[int, ...]) -> float:
     """
     Get the ratio to fit the board to the window its allocated.
     """
-    return min(p / f for p, f in zip(parent_shape, fit_shape))
+    p_w, p_h = parent_shape
+    f_w, f_h = fit_shape
+    return min(p_w / f_w, p_h / f_h)
 
 
 def centerCoord(coord: tuple[int, ...], allocated_shape: tuple[int, ...], fit_shape: tuple[int, ...]) -> tuple[int, ...]:
     """
     Get the coordinate to center the board in the window.
     """
-    return tuple(((p - f) // 2) + c for p, f, c in zip(allocated_shape, fit_shape, coord))
+    x, y = coord
+    a_w, a_h = allocated_shape
+    f_w, f_h = fit_shape
+    return (a_w - f_w) // 2 + x, (a_h - f_h) // 2 + y
+
+
+def scaleTo(surface: pygame.Surface, size: tuple[int, int]) -> pygame.Surface:
+    """
+    Scale the surface to the size, the surface itself is returned if it already has that size.
+    """
+    if surface.get_size() == size:
+        return surface
+    return pygame.transform.scale(surface, size)
+
+
+def displayFormat(surface: pygame.Surface, alpha: bool = True) -> pygame.Surface:
+    """
+    Convert the surface to the pixel format of the display so blits do not convert it each frame.
+    :param surface: - the surface to convert
+    :param alpha:   - keep per pixel transparency, opaque surfaces can skip it
+    :return:        - the converted surface, or the same one if there is no display yet
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+def popEvents(events: list[pygame.event.Event], type: int, key: int = None) -> list[pygame.event.Event]:
+    """
+    Remove the matching events from the frame events, so they are not handled twice.
+    :param events: - the events of the current frame
+    :param type:   - the type of the events to take
+    :param key:    - only take the key events of this key if given
+    :return:       - the removed events
+    """
+    taken, kept = [], []
+    for event in events:
+        if event.type == type and (key is None or event.key == key):
+            taken.append(event)
+        else:
+            kept.append(event)
+    if taken:
+        events[:] = kept
+    return taken
+
+
+def updateMousePos():
+    """
+    Read the mouse position once for the frame being processed.
+    """
+    global mouse_pos
+    mouse_pos = pygame.mouse.get_pos()
+
+
+def getMousePos() -> tuple[int, int]:
+    """
+    Get the mouse position of the frame being processed.
+    """
+    return mouse_pos
 
 
 def mouseIn(coord: tuple[int, ...], size: tuple[int, ...]) -> bool:
@@ -23,15 +87,16 @@ def mouseIn(coord: tuple[int, ...], size: tuple[int, ...]) -> bool:
     :param size:  - the size of the rectangle
     :return:    - True if the mouse is in the rectangle
     """
-    x, y = pygame.mouse.get_pos()
+    x, y = mouse_pos
     min_x, min_y = coord
-    max_x, max_y = tuple(c + s for c, s in zip(coord, size))
-    return min_x <= x <= max_x and min_y <= y <= max_y
+    width, height = size
+    return min_x <= x <= min_x + width and min_y <= y <= min_y + height
 
 
+@lru_cache(maxsize=512)
 def cropText(text: str, font: pygame.font.Font, width: int) -> str:
     """
-    Crop the text to fit the width.
+    Crop the text to fit the width, fonts are shared per size so the result is cached per font instance.
     """
     if font.size(text)[0] <= width:
         return text
@@ -42,11 +107,15 @@ def cropText(text: str, font: pygame.font.Font, width: int) -> str:
         text = new_text
     else:
         return text + '...'
-    while font.size(text + '...')[0] > width:
-        if len(text) == 0:
-            return '...'
-        text = text[:-1]
-    return text + '...'
+    # the longest prefix that fits with the ellipsis, the width grows with the length
+    low, high = 0, len(text) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if font.size(text[:middle] + '...')[0] <= width:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + '...'
 
 
 def scaledImage(child_size: tuple[int, int],